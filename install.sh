@@ -153,12 +153,17 @@ install_python_deps() {
         aiohttp \
         asyncio \
         fastapi \
-        uvicorn \
+        "uvicorn[standard]" \
         websockets \
+        uvloop \
+        orjson \
         sqlalchemy \
         cryptography \
         psutil \
-        python-dotenv
+        pulsectl-asyncio \
+        dbus-next \
+        python-dotenv \
+        cachetools
     
     print_success "Python dependencies installed"
 }
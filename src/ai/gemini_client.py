@@ -3,32 +3,31 @@ Gemini Client - Interface to Google's Gemini AI API
 Uses the latest google-genai SDK
 """
 
+import asyncio
 import json
 import logging
-from typing import Dict, List, Optional
+import random
+import re
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+import orjson
+from cachetools import TTLCache
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 
+# Parsed responses reused for repeated queries in the same window context
+RESPONSE_CACHE_SIZE = 512
+RESPONSE_CACHE_TTL_SECONDS = 300
 
-class GeminiClient:
-    """Client for interacting with Gemini API"""
-    
-    def __init__(self, api_key: str, model: str = "gemini-2.0-flash"):
-        self.logger = logging.getLogger('gemini')
-        self.api_key = api_key
-        self.model = model
-        
-        # Initialize client
-        self.client = genai.Client(api_key=api_key)
-        
-        # System prompt for desktop automation
-        self.system_prompt = self._build_system_prompt()
-        
-        self.logger.info(f"Initialized Gemini client with model: {model}")
-    
-    def _build_system_prompt(self) -> str:
-        """Build comprehensive system prompt"""
-        return """You are an advanced AI assistant with complete control over an Arch Linux system running Hyprland (Wayland compositor). You have the ability to:
+# Rate limiting and transient server errors are retried with exponential backoff
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 4
+MAX_BACKOFF_SECONDS = 8
+
+# Markdown code fence the model sometimes wraps its JSON in
+_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*(.*?)\s*(?:```)?\s*$', re.DOTALL)
+
+# System prompt for desktop automation
+_SYSTEM_PROMPT = """You are an advanced AI assistant with complete control over an Arch Linux system running Hyprland (Wayland compositor). You have the ability to:
 
 1. **Control Applications**: Launch, focus, move, resize, and close any application
 2. **Manage Windows**: Switch workspaces, tile windows, toggle fullscreen/floating
@@ -109,6 +108,90 @@ class GeminiClient:
 
 Use this context to make intelligent decisions about how to fulfill the user's request."""
 
+
+class _ActionStreamParser:
+    """Incrementally extracts complete action objects from a streamed JSON response"""
+    
+    _ACTIONS_RE = re.compile(r'(?<!\\)"actions"\s*:\s*\[')
+    _SEPARATOR_RE = re.compile(r'[\s,]*')
+    
+    def __init__(self):
+        self._chunks: List[str] = []  # Unparsed text, joined only when it may hold a complete item
+        self._in_actions = False  # Past the opening bracket of the actions array
+        self._done = False
+        self._decoder = json.JSONDecoder()
+        self.count = 0
+    
+    def feed(self, text: str) -> List[Dict]:
+        """Add a streamed chunk and return the actions it completed"""
+        if self._done:
+            return []
+        
+        self._chunks.append(text)
+        
+        # The array can only open once a '[' arrives, and an action can only
+        # complete once a closing brace arrives
+        if ('}' if self._in_actions else '[') not in text:
+            return []
+        
+        buffer = ''.join(self._chunks)
+        pos = 0
+        
+        if not self._in_actions:
+            match = self._ACTIONS_RE.search(buffer)
+            if not match:
+                self._chunks = [buffer]
+                return []
+            self._in_actions = True
+            pos = match.end()
+        
+        actions = []
+        while True:
+            pos = self._SEPARATOR_RE.match(buffer, pos).end()
+            if pos >= len(buffer):
+                break
+            
+            if buffer[pos] == ']':
+                self._done = True
+                break
+            
+            try:
+                action, pos = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break  # Action not complete yet
+            
+            actions.append(action)
+        
+        # Keep only the unparsed tail (at most one partial action)
+        self._chunks = [] if self._done else [buffer[pos:]]
+        
+        self.count += len(actions)
+        return actions
+
+
+class GeminiClient:
+    """Client for interacting with Gemini API"""
+    
+    def __init__(self, api_key: str, model: str = "gemini-2.0-flash"):
+        self.logger = logging.getLogger('gemini')
+        self.api_key = api_key
+        self.model = model
+        
+        # Initialize client
+        self.client = genai.Client(api_key=api_key)
+        
+        # System prompt for desktop automation
+        self.system_prompt = _SYSTEM_PROMPT
+        
+        # Static prompt prefix, identical across queries so Gemini's implicit
+        # prefix cache can match it
+        self._static_prefix = self.system_prompt + "\n\n"
+        
+        # Recent responses keyed by (normalized query, active window class)
+        self._response_cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL_SECONDS)
+        
+        self.logger.info(f"Initialized Gemini client with model: {model}")
+    
     async def process_query(self, query: str, context: Dict) -> Dict:
         """
         Process user query with full system context
@@ -120,55 +203,40 @@ Use this context to make intelligent decisions about how to fulfill the user's r
         Returns:
             dict: Parsed response with actions
         """
+        # Screenshots make the context unique, so only cache text-only queries
+        cache_key = None if context.get('screenshot_bytes') else self._response_cache_key(query, context)
+        if cache_key is not None:
+            cached_response = self._response_cache.get(cache_key)
+            if cached_response is not None:
+                self.logger.info(f"Using cached response: {cached_response.get('explanation', '')}")
+                return cached_response
+        
         try:
-            # Build the full prompt
-            full_prompt = self._build_prompt(query, context)
-            
-            # Configure generation
-            config = types.GenerateContentConfig(
-                temperature=0.7,
-                top_p=0.95,
-                max_output_tokens=4096,
-                response_mime_type="application/json"
-            )
+            contents, config = await self._prepare_request(query, context)
             
-            # Handle screenshot if present
-            contents = []
-            if context.get('screenshot'):
-                import base64
-                screenshot_bytes = base64.b64decode(context['screenshot'])
-                contents.append({
-                    'mime_type': 'image/png',
-                    'data': screenshot_bytes
-                })
-            
-            contents.append(full_prompt)
-            
-            # Generate response
-            response = self.client.models.generate_content(
+            # Generate response without blocking the event loop
+            response = await self._with_retries(lambda: self.client.aio.models.generate_content(
                 model=self.model,
                 contents=contents,
                 config=config
-            )
-            
-            # Parse JSON response
-            response_text = response.text.strip()
+            ))
             
-            # Remove markdown code blocks if present
-            if response_text.startswith('```json'):
-                response_text = response_text[7:]
-            if response_text.startswith('```'):
-                response_text = response_text[3:]
-            if response_text.endswith('```'):
-                response_text = response_text[:-3]
+            # Parse JSON response, removing markdown code blocks if present
+            response_text = response.text
+            match = _FENCE_RE.match(response_text)
+            if match:
+                response_text = match.group(1)
             
-            parsed_response = json.loads(response_text.strip())
+            parsed_response = orjson.loads(response_text)
             
             self.logger.info(f"Gemini response: {parsed_response.get('explanation', '')}")
             
+            if cache_key is not None:
+                self._response_cache[cache_key] = parsed_response
+            
             return parsed_response
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             self.logger.error(f"Failed to parse Gemini response: {e}")
             return {
                 'explanation': 'Error: Could not parse AI response',
@@ -183,8 +251,113 @@ Use this context to make intelligent decisions about how to fulfill the user's r
                 'error': str(e)
             }
     
+    async def stream_query(self, query: str, context: Dict) -> AsyncIterator[Dict]:
+        """
+        Process user query, yielding each action as soon as it is generated
+        
+        Args:
+            query: User's natural language command
+            context: System context (state, keybindings, etc.)
+            
+        Yields:
+            dict: Actions in response order
+            
+        Raises:
+            Exception: If the request or the stream fails; actions already
+                yielded are then only part of the plan
+        """
+        parser = _ActionStreamParser()
+        
+        try:
+            contents, config = await self._prepare_request(query, context)
+            
+            async def open_stream():
+                stream = await self.client.aio.models.generate_content_stream(
+                    model=self.model,
+                    contents=contents,
+                    config=config
+                )
+                # The request is only sent (and can only fail) once the first chunk is pulled
+                return stream, await anext(stream, None)
+            
+            # Retry up to the first chunk; failures after that surface to the caller
+            stream, first = await self._with_retries(open_stream)
+            
+            if first is not None and first.text:
+                for action in parser.feed(first.text):
+                    yield action
+            
+            async for chunk in stream:
+                if chunk.text:
+                    for action in parser.feed(chunk.text):
+                        yield action
+            
+            self.logger.info(f"Gemini streamed {parser.count} actions")
+            
+        except Exception as e:
+            self.logger.error(f"Error streaming query: {e}", exc_info=True)
+            raise
+    
+    async def process_queries(self, items: List[Tuple[str, Dict]]) -> List[Dict]:
+        """
+        Process several independent queries concurrently
+        
+        Args:
+            items: List of (query, context) pairs
+            
+        Returns:
+            list: Parsed responses, in the same order as items
+        """
+        return await asyncio.gather(*(self.process_query(query, context) for query, context in items))
+    
+    async def _with_retries(self, request: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a Gemini request, retrying rate limits and server errors with backoff and jitter"""
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                return await request()
+            except errors.APIError as e:
+                if e.code not in RETRYABLE_STATUS_CODES or attempt == MAX_RETRIES:
+                    raise
+                
+                delay = min(2 ** attempt, MAX_BACKOFF_SECONDS) + random.random()
+                self.logger.warning(f"Gemini request failed ({e.code}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+    
+    def _response_cache_key(self, query: str, context: Dict) -> Tuple[str, str]:
+        """Build the response cache key for a query"""
+        active_window = context.get('system_info', {}).get('active_window') or {}
+        return (' '.join(query.lower().split()), active_window.get('class', ''))
+    
+    async def _prepare_request(self, query: str, context: Dict) -> Tuple[List, types.GenerateContentConfig]:
+        """Build request contents and generation config for a query"""
+        # Build the dynamic part of the prompt
+        prompt = self._build_prompt(query, context)
+        
+        # Configure generation
+        config = types.GenerateContentConfig(
+            temperature=0.7,
+            top_p=0.95,
+            max_output_tokens=4096,
+            response_mime_type="application/json"
+        )
+        
+        # Send the static prefix first so it is byte-identical across calls
+        contents = [self._static_prefix]
+        
+        # Handle screenshot if present (raw image bytes)
+        screenshot_bytes = context.get('screenshot_bytes')
+        if screenshot_bytes:
+            contents.append(types.Part.from_bytes(
+                data=screenshot_bytes,
+                mime_type=context.get('screenshot_mime', 'image/png')
+            ))
+        
+        contents.append(prompt)
+        
+        return contents, config
+    
     def _build_prompt(self, query: str, context: Dict) -> str:
-        """Build comprehensive prompt with context"""
+        """Build the dynamic prompt suffix that follows the static prefix"""
         
         # Extract key context elements
         active_window = context.get('system_info', {}).get('active_window', {})
@@ -192,9 +365,7 @@ Use this context to make intelligent decisions about how to fulfill the user's r
         keybindings = context.get('keybindings', [])[:20]  # Limit to 20 most relevant
         recent_commands = context.get('recent_activity', [])[:5]
         
-        prompt = f"""{self.system_prompt}
-
-**Current System State**:
+        prompt = f"""**Current System State**:
 - Active Window: {active_window.get('class', 'None')} - {active_window.get('title', '')}
 - Workspace: {workspace.get('id', 'Unknown')}
 - Monitors: {len(context.get('system_info', {}).get('monitors', []))}
@@ -221,27 +392,20 @@ Use this context to make intelligent decisions about how to fulfill the user's r
         if not keybindings:
             return "No keybindings loaded yet"
         
-        lines = []
-        for kb in keybindings[:15]:  # Limit display
-            mod = kb.get('modifiers', '')
-            key = kb.get('key', '')
-            action = kb.get('action', '')
-            lines.append(f"  - {mod}+{key}: {action}")
-        
-        return '\n'.join(lines) if lines else "None configured"
+        return '\n'.join(
+            f"  - {kb.get('modifiers', '')}+{kb.get('key', '')}: {kb.get('action', '')}"
+            for kb in keybindings[:15]  # Limit display
+        ) or "None configured"
     
     def _format_recent_commands(self, commands: List[Dict]) -> str:
         """Format recent commands for context"""
         if not commands:
             return "No recent commands"
         
-        lines = []
-        for cmd in commands[:5]:
-            command = cmd.get('command', '')
-            success = '✓' if cmd.get('success') else '✗'
-            lines.append(f"  {success} {command[:60]}")
-        
-        return '\n'.join(lines) if lines else "None"
+        return '\n'.join(
+            f"  {'✓' if cmd.get('success') else '✗'} {cmd.get('command', '')[:60]}"
+            for cmd in commands[:5]
+        ) or "None"
     
     async def chat(self, messages: List[Dict]) -> str:
         """
@@ -255,12 +419,12 @@ Use this context to make intelligent decisions about how to fulfill the user's r
         """
         try:
             # Create chat session
-            chat = self.client.chats.create(model=self.model)
+            chat = self.client.aio.chats.create(model=self.model)
             
             # Send messages
             for msg in messages:
                 if msg['role'] == 'user':
-                    response = chat.send_message(msg['content'])
+                    response = await chat.send_message(msg['content'])
             
             return response.text
             
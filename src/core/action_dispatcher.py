@@ -4,16 +4,90 @@ Handles keyboard, mouse, shell commands, and system control
 """
 
 import asyncio
+import functools
 import subprocess
 import logging
 import os
-from typing import Dict, Any, List
+import re
+import shutil
+import socket
+import string
+import struct
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 from pathlib import Path
 
 
+# Map modifier names to ydotool key codes
+_MOD_MAP = {
+    'super': '125',  # Left Super
+    'ctrl': '29',    # Left Ctrl
+    'alt': '56',     # Left Alt
+    'shift': '42',   # Left Shift
+}
+
+_KEY_MAP = {
+    'return': '28',
+    'enter': '28',
+    'space': '57',
+    'tab': '15',
+    'esc': '1',
+    'escape': '1',
+    'backspace': '14',
+    'delete': '111',
+    'left': '105',
+    'right': '106',
+    'up': '103',
+    'down': '108',
+    'home': '102',
+    'end': '107',
+    'pageup': '104',
+    'pagedown': '109',
+}
+
+# All known key names in one table: modifiers, named keys,
+# letters (approximate mapping) and the digit row
+_KEYCODE = {
+    **_MOD_MAP,
+    **_KEY_MAP,
+    **{c: str(ord(c) - ord('a') + 30) for c in string.ascii_lowercase},
+    **{d: str(i + 2) for i, d in enumerate('1234567890')},
+}
+
+# ydotoold input socket and the input_event layout it reads from clients
+_YDOTOOL_SOCKET = os.environ.get('YDOTOOL_SOCKET', '/tmp/.ydotool_socket')
+_INPUT_EVENT = struct.Struct('llHHi')
+_EV_SYN = 0x00
+_EV_KEY = 0x01
+_SYN_REPORT = 0
+
+# Pause between key events, matching the `ydotool key` default --key-delay
+_KEY_DELAY = 0.012  # seconds
+
+# Commands blocked for safety
+_DANGER_RE = re.compile(r'rm\s+-rf\s+/|mkfs|dd\s+if=')
+
+
+def _read_head(path: Path, size: int) -> str:
+    """Read at most size characters from the start of a text file"""
+    with open(path, 'r') as f:
+        return f.read(size)
+
+
 class ActionDispatcher:
     """Executes actions safely and reports results"""
     
+    # Read-only action types that can run concurrently with each other
+    _PARALLEL_SAFE = frozenset({'file_read'})
+    
+    # Hyprland dispatchers and the event confirming they took effect
+    _DISPATCH_SETTLE_EVENTS = {
+        'workspace': 'workspace_changed',
+        'focuswindow': 'window_focused',
+        'movetoworkspace': 'window_moved',
+        'fullscreen': 'fullscreen_changed',
+        'exec': 'window_opened',
+    }
+    
     def __init__(self, hyprland_connector, system_monitor):
         self.logger = logging.getLogger('dispatcher')
         self.hyprland = hyprland_connector
@@ -35,6 +109,12 @@ class ActionDispatcher:
             'process_control': self._handle_process_control,
         }
         
+        # Detected terminal emulator (resolved on first use)
+        self._terminal_cache: Optional[str] = None
+        
+        # Persistent connection to ydotoold (opened on first use)
+        self._ydotool_sock: Optional[socket.socket] = None
+        
         self.logger.info("Action dispatcher initialized")
     
     async def execute(self, action: Dict[str, Any]) -> Dict:
@@ -70,6 +150,56 @@ class ActionDispatcher:
                 'error': str(e)
             }
     
+    async def execute_many(self, actions: List[Dict[str, Any]]) -> List[Dict]:
+        """
+        Execute several actions, running consecutive read-only actions concurrently
+        
+        Args:
+            actions: List of action dicts with 'type' and 'params'
+            
+        Returns:
+            list: Results in the same order as actions
+        """
+        results = []
+        batch = []
+        
+        for action in actions:
+            if self._is_parallel_safe(action):
+                batch.append(action)
+                continue
+            
+            if batch:
+                results.extend(await asyncio.gather(*(self.execute(a) for a in batch)))
+                batch = []
+            
+            results.append(await self.execute(action))
+        
+        if batch:
+            results.extend(await asyncio.gather(*(self.execute(a) for a in batch)))
+        
+        return results
+    
+    def _is_parallel_safe(self, action: Dict[str, Any]) -> bool:
+        """Check whether an action has no side effects on other actions"""
+        action_type = action.get('type')
+        params = action.get('params', {})
+        if action_type == 'process_control':
+            return params.get('action') == 'list'
+        if action_type == 'screenshot':
+            # Selections open an interactive slurp overlay, and saved captures
+            # are named per second so concurrent ones would overwrite each other
+            return params.get('region', 'full') != 'selection' and not params.get('save', False)
+        return action_type in self._PARALLEL_SAFE
+    
+    def get_settle_event(self, action: Dict[str, Any]) -> Optional[str]:
+        """Get the Hyprland event that confirms an action took effect, if it needs one"""
+        action_type = action.get('type')
+        if action_type == 'focus_window':
+            return 'window_focused'
+        if action_type == 'hyprland_dispatch':
+            return self._DISPATCH_SETTLE_EVENTS.get(action.get('params', {}).get('dispatcher'))
+        return None
+    
     def get_available_actions(self) -> List[str]:
         """Get list of available action types"""
         return list(self.handlers.keys())
@@ -94,59 +224,94 @@ class ActionDispatcher:
     
     async def _send_key_combo(self, combo: str) -> str:
         """Send a key combination"""
-        # Map modifier names to ydotool key codes
-        modifier_map = {
-            'super': '125',  # Left Super
-            'ctrl': '29',    # Left Ctrl
-            'alt': '56',     # Left Alt
-            'shift': '42',   # Left Shift
-        }
-        
-        key_map = {
-            'return': '28',
-            'enter': '28',
-            'space': '57',
-            'tab': '15',
-            'esc': '1',
-            'escape': '1',
-            'backspace': '14',
-            'delete': '111',
-            'left': '105',
-            'right': '106',
-            'up': '103',
-            'down': '108',
-            'home': '102',
-            'end': '107',
-            'pageup': '104',
-            'pagedown': '109',
-        }
+        await self._send_keys(self._compile_combo(combo))
         
+        return f"Sent key combo: {combo}"
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _compile_combo(combo: str) -> Tuple[str, ...]:
+        """Translate a key combo into ydotool 'code:state' press/release events"""
         # Parse combo
         parts = [p.strip().lower() for p in combo.split('+')]
         
-        # Build ydotool command
         key_presses = []
         key_releases = []
         
         for part in parts:
-            if part in modifier_map:
-                key_code = modifier_map[part]
-            elif part in key_map:
-                key_code = key_map[part]
-            elif len(part) == 1 and part.isalpha():
-                # Letter key - approximate mapping
-                key_code = str(ord(part.lower()) - ord('a') + 30)
-            else:
-                self.logger.warning(f"Unknown key: {part}, skipping")
+            key_code = _KEYCODE.get(part)
+            if key_code is None:
+                logging.getLogger('dispatcher').warning(f"Unknown key: {part}, skipping")
                 continue
             
             key_presses.append(f"{key_code}:1")
             key_releases.insert(0, f"{key_code}:0")  # Release in reverse order
         
         # Combine press and release
-        all_keys = key_presses + key_releases
-        
-        cmd = ['ydotool', 'key'] + all_keys
+        return tuple(key_presses + key_releases)
+    
+    def _get_ydotool_socket(self) -> Optional[socket.socket]:
+        """Return a connected socket to ydotoold, or None if it is not running"""
+        if self._ydotool_sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            try:
+                sock.connect(_YDOTOOL_SOCKET)
+            except OSError:
+                sock.close()
+                return None
+            sock.setblocking(False)
+            self._ydotool_sock = sock
+        return self._ydotool_sock
+    
+    async def _send_keys(self, all_keys: Sequence[str]):
+        """Send 'code:state' key events through ydotoold, spawning ydotool as a fallback"""
+        sock = self._get_ydotool_socket()
+        if sock is not None:
+            events = []
+            for key in all_keys:
+                code, state = key.split(':')
+                events.append((
+                    code,
+                    state != '0',
+                    _INPUT_EVENT.pack(0, 0, _EV_KEY, int(code), int(state)),
+                    _INPUT_EVENT.pack(0, 0, _EV_SYN, _SYN_REPORT, 0)
+                ))
+            
+            held = []  # Codes pressed but not yet released
+            sent = False
+            try:
+                for i, (code, pressed, key_event, syn_event) in enumerate(events):
+                    if i:
+                        await asyncio.sleep(_KEY_DELAY)
+                    sock.send(key_event)
+                    sent = True
+                    if pressed:
+                        held.append(code)
+                    elif code in held:
+                        held.remove(code)
+                    sock.send(syn_event)
+                return
+            except OSError as e:
+                sock.close()
+                self._ydotool_sock = None
+                
+                if sent:
+                    # Replaying the whole combo would repeat the keys that went out;
+                    # just make sure nothing is left held down
+                    if held:
+                        try:
+                            await self._run_ydotool_keys([f"{code}:0" for code in reversed(held)])
+                        except Exception as release_error:
+                            self.logger.error(f"Could not release held keys {held}: {release_error}")
+                    raise RuntimeError(f"ydotoold socket failed mid-combo: {e}")
+                
+                self.logger.debug(f"ydotoold socket error, falling back to ydotool: {e}")
+        
+        await self._run_ydotool_keys(all_keys)
+    
+    async def _run_ydotool_keys(self, keys: Sequence[str]):
+        """Send 'code:state' key events by spawning ydotool"""
+        cmd = ['ydotool', 'key', *keys]
         
         proc = await asyncio.create_subprocess_exec(
             *cmd,
@@ -158,8 +323,6 @@ class ActionDispatcher:
         
         if proc.returncode != 0:
             raise RuntimeError(f"ydotool error: {stderr.decode()}")
-        
-        return f"Sent key combo: {combo}"
     
     async def _type_text(self, text: str, delay: float) -> str:
         """Type text using ydotool"""
@@ -224,8 +387,7 @@ class ActionDispatcher:
             raise ValueError("No command specified")
         
         # Security check - don't allow certain dangerous commands
-        dangerous_patterns = ['rm -rf /', 'mkfs', 'dd if=']
-        if any(pattern in command for pattern in dangerous_patterns):
+        if _DANGER_RE.search(command):
             raise RuntimeError("Dangerous command blocked for safety")
         
         if terminal:
@@ -254,11 +416,12 @@ class ActionDispatcher:
     
     async def _detect_terminal(self) -> str:
         """Detect which terminal emulator is installed"""
+        if self._terminal_cache:
+            return self._terminal_cache
+        
         terminals = ['kitty', 'alacritty', 'foot', 'wezterm', 'terminator', 'gnome-terminal']
-        for term in terminals:
-            if subprocess.run(['which', term], capture_output=True).returncode == 0:
-                return term
-        return 'xterm'  # Fallback
+        self._terminal_cache = next((term for term in terminals if shutil.which(term)), 'xterm')  # Fallback
+        return self._terminal_cache
     
     async def _handle_hyprland_dispatch(self, params: Dict) -> str:
         """Execute Hyprland dispatcher"""
@@ -289,15 +452,24 @@ class ActionDispatcher:
     
     async def take_screenshot(self, region: str = 'full') -> bytes:
         """Take screenshot and return bytes"""
-        if region == 'full':
-            cmd = ['grim', '-']
-        elif region == 'selection':
-            cmd = ['grim', '-g', '$(slurp)', '-']
+        if region == 'selection':
+            # Let the user pick a region first
+            slurp = await asyncio.create_subprocess_exec(
+                'slurp',
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            geometry, stderr = await slurp.communicate()
+            
+            if slurp.returncode != 0:
+                raise RuntimeError(f"Region selection failed: {stderr.decode()}")
+            
+            cmd = ['grim', '-g', geometry.decode().strip(), '-']
         else:
             cmd = ['grim', '-']
         
-        proc = await asyncio.create_subprocess_shell(
-            ' '.join(cmd),
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE
         )
@@ -348,8 +520,8 @@ class ActionDispatcher:
         
         filepath.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(filepath, 'w') as f:
-            f.write(content)
+        # Write off the event loop
+        await asyncio.to_thread(filepath.write_text, content)
         
         return f"Wrote {len(content)} bytes to {filepath}"
     
@@ -369,10 +541,8 @@ class ActionDispatcher:
         if filepath.stat().st_size > 1024 * 1024:  # 1MB
             raise RuntimeError("File too large (max 1MB)")
         
-        with open(filepath, 'r') as f:
-            content = f.read()
-        
-        return content[:5000]  # Limit to 5000 chars
+        # Read off the event loop, limited to 5000 chars
+        return await asyncio.to_thread(_read_head, filepath, 5000)
     
     async def _handle_audio_control(self, params: Dict) -> str:
         """Control system audio"""
@@ -418,13 +588,14 @@ class ActionDispatcher:
         identifier = params.get('identifier', '')
         
         if action == 'list':
-            cmd = ['ps', 'aux']
-            proc = await asyncio.create_subprocess_exec(
-                *cmd,
+            # Top 20 processes by CPU, trimmed before it reaches us
+            cmd = 'ps -eo pid,comm,pcpu,pmem --sort=-pcpu | head -n 21'
+            proc = await asyncio.create_subprocess_shell(
+                cmd,
                 stdout=asyncio.subprocess.PIPE
             )
             stdout, _ = await proc.communicate()
-            return stdout.decode()[:2000]
+            return stdout.decode()
         
         elif action == 'kill':
             if not identifier:
@@ -4,17 +4,80 @@ Listens to events, executes dispatchers, queries system state
 """
 
 import asyncio
-import json
+import functools
+import orjson
 import os
 import socket
 import logging
-from typing import Dict, List, Optional, Callable
-from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Callable
+
+# Bursts of state events within this window reach callbacks only once
+COALESCE_WINDOW = 0.025  # seconds
 
 
 class HyprlandConnector:
     """Manages connection and interaction with Hyprland"""
     
+    # Raw Hyprland event names and the event types reported to callbacks
+    _EVENT_MAP = {
+        'workspace': 'workspace_changed',
+        'focusedmon': 'monitor_changed',
+        'activewindow': 'window_focused',
+        'openwindow': 'window_opened',
+        'closewindow': 'window_closed',
+        'movewindow': 'window_moved',
+        'activewindowv2': 'window_activated',
+        'fullscreen': 'fullscreen_changed',
+        'monitoradded': 'monitor_added',
+        'monitorremoved': 'monitor_removed',
+    }
+    
+    # State events where only the latest value matters; these are coalesced
+    _COALESCED_EVENTS = frozenset({'workspace', 'focusedmon', 'activewindow', 'activewindowv2', 'fullscreen'})
+    
+    # State slices reported by get_state and the hyprctl query behind each
+    _STATE_COMMANDS = {
+        'active_window': 'activewindow',
+        'workspaces': 'workspaces',
+        'monitors': 'monitors',
+        'clients': 'clients',
+        'workspace': 'activeworkspace',
+    }
+    
+    # Cached state slices invalidated by each raw event; events not listed
+    # here (or in _STATELESS_EVENTS) invalidate everything
+    _WINDOW_SLICES = frozenset({'active_window', 'clients', 'workspace', 'workspaces'})
+    _WORKSPACE_SLICES = frozenset({'active_window', 'workspace', 'workspaces', 'monitors'})
+    _EVENT_SLICES = {
+        'workspace': _WORKSPACE_SLICES,
+        'workspacev2': _WORKSPACE_SLICES,
+        'focusedmon': _WORKSPACE_SLICES,
+        'focusedmonv2': _WORKSPACE_SLICES,
+        'createworkspace': _WORKSPACE_SLICES,
+        'createworkspacev2': _WORKSPACE_SLICES,
+        'destroyworkspace': _WORKSPACE_SLICES,
+        'destroyworkspacev2': _WORKSPACE_SLICES,
+        'moveworkspace': _WORKSPACE_SLICES,
+        'moveworkspacev2': _WORKSPACE_SLICES,
+        'renameworkspace': _WORKSPACE_SLICES,
+        'activespecial': _WORKSPACE_SLICES,
+        'activewindow': _WINDOW_SLICES,
+        'activewindowv2': _WINDOW_SLICES,
+        'openwindow': _WINDOW_SLICES,
+        'closewindow': _WINDOW_SLICES,
+        'movewindow': _WINDOW_SLICES,
+        'movewindowv2': _WINDOW_SLICES,
+        'windowtitle': _WINDOW_SLICES,
+        'windowtitlev2': _WINDOW_SLICES,
+        'fullscreen': _WINDOW_SLICES,
+        'changefloatingmode': _WINDOW_SLICES,
+        'pin': _WINDOW_SLICES,
+        'minimized': _WINDOW_SLICES,
+    }
+    
+    # Events that don't touch any cached state
+    _STATELESS_EVENTS = frozenset({'activelayout', 'submap', 'screencast', 'bell', 'urgent'})
+    
     def __init__(self):
         self.logger = logging.getLogger('hyprland')
         
@@ -30,15 +93,35 @@ class HyprlandConnector:
         self.event_callbacks = []
         self.running = False
         
+        # Coalesced events waiting for dispatch (event type -> latest data)
+        self._pending_events: Dict[str, str] = {}
+        self._pending_since = 0.0
+        self._pending_ready = asyncio.Event()
+        
+        # Held while delivering events so subscribers see them in arrival order
+        self._delivery_lock = asyncio.Lock()
+        
+        # One-shot waiters for the next event of a type
+        self._event_waiters: Dict[str, List[asyncio.Future]] = {}
+        
+        # Hyprland state kept current by the event listener; slices in
+        # _dirty_slices are re-queried on the next get_state call
+        self._cached_state: Dict = {'active_window': {}, 'workspaces': [], 'monitors': [], 'clients': [], 'workspace': {}}
+        self._dirty_slices = set(self._STATE_COMMANDS)
+        self._listener_connected = False
+        self._state_lock = asyncio.Lock()
+        
         self.logger.info(f"Initialized Hyprland connector (instance: {self.instance_sig})")
     
     def _detect_instance(self) -> str:
         """Detect Hyprland instance signature"""
-        hypr_dir = Path("/tmp/hypr")
-        if hypr_dir.exists():
-            instances = [d.name for d in hypr_dir.iterdir() if d.is_dir()]
-            if instances:
-                return instances[0]
+        try:
+            with os.scandir("/tmp/hypr") as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        return entry.name
+        except FileNotFoundError:
+            pass
         raise RuntimeError("Could not detect Hyprland instance. Is Hyprland running?")
     
     async def start_event_listener(self):
@@ -46,66 +129,150 @@ class HyprlandConnector:
         self.running = True
         self.logger.info("Starting Hyprland event listener...")
         
-        while self.running:
-            try:
-                reader, writer = await asyncio.open_unix_connection(self.socket2_path)
-                self.logger.info("Connected to Hyprland event socket")
-                
-                while self.running:
-                    data = await reader.read(4096)
-                    if not data:
-                        break
+        coalescer = asyncio.create_task(self._dispatch_coalesced_events(), name="hyprland_event_coalescer")
+        
+        try:
+            while self.running:
+                try:
+                    reader, writer = await asyncio.open_unix_connection(self.socket2_path)
+                    self.logger.info("Connected to Hyprland event socket")
                     
-                    # Parse events (format: "EVENT>>DATA\n")
-                    lines = data.decode('utf-8').strip().split('\n')
-                    for line in lines:
-                        if '>>' in line:
-                            event, event_data = line.split('>>', 1)
-                            await self._handle_event(event, event_data)
-                
-                writer.close()
-                await writer.wait_closed()
-                
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                self.logger.error(f"Event listener error: {e}")
-                await asyncio.sleep(5)  # Reconnect delay
+                    # Changes may have been missed while disconnected
+                    self._dirty_slices.update(self._STATE_COMMANDS)
+                    self._listener_connected = True
+                    
+                    while self.running:
+                        # One event per line (format: "EVENT>>DATA\n")
+                        line = await reader.readline()
+                        if not line:
+                            break
+                        
+                        # Scan the raw bytes and decode only the parts of actual events
+                        idx = line.find(b'>>')
+                        if idx > 0:
+                            await self._handle_event(
+                                line[:idx].decode('utf-8', 'replace'),
+                                line[idx + 2:].rstrip(b'\n').decode('utf-8', 'replace')
+                            )
+                    
+                    self._listener_connected = False
+                    writer.close()
+                    await writer.wait_closed()
+                    
+                except asyncio.CancelledError:
+                    break
+                except Exception as e:
+                    self._listener_connected = False
+                    self.logger.error(f"Event listener error: {e}")
+                    await asyncio.sleep(5)  # Reconnect delay
+        finally:
+            self._listener_connected = False
+            coalescer.cancel()
     
     async def _handle_event(self, event: str, data: str):
         """Process Hyprland events"""
-        event_map = {
-            'workspace': 'workspace_changed',
-            'focusedmon': 'monitor_changed',
-            'activewindow': 'window_focused',
-            'openwindow': 'window_opened',
-            'closewindow': 'window_closed',
-            'movewindow': 'window_moved',
-            'activewindowv2': 'window_activated',
-            'fullscreen': 'fullscreen_changed',
-            'monitoradded': 'monitor_added',
-            'monitorremoved': 'monitor_removed',
-        }
-        
-        event_type = event_map.get(event, event)
+        event_type = self._EVENT_MAP.get(event, event)
         self.logger.debug(f"Event: {event_type} -> {data}")
         
-        # Notify callbacks
-        for callback in self.event_callbacks:
-            try:
-                await callback(event_type, data)
-            except Exception as e:
-                self.logger.error(f"Error in event callback: {e}")
+        # Invalidate affected state right away, even for coalesced events
+        if event not in self._STATELESS_EVENTS:
+            self._dirty_slices.update(self._EVENT_SLICES.get(event, self._STATE_COMMANDS))
+        
+        # Keep only the latest state event of each type within a burst
+        if event in self._COALESCED_EVENTS:
+            if not self._pending_events:
+                self._pending_since = asyncio.get_running_loop().time()
+                self._pending_ready.set()
+            self._pending_events[event_type] = data
+            return
+        
+        # Deliver earlier coalesced events first so ordering is preserved
+        async with self._delivery_lock:
+            await self._flush_pending_events()
+            await self._notify(event_type, data)
+    
+    async def _dispatch_coalesced_events(self):
+        """Deliver coalesced events once their burst window has passed"""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            await self._pending_ready.wait()
+            
+            delay = COALESCE_WINDOW - (loop.time() - self._pending_since)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            
+            async with self._delivery_lock:
+                await self._flush_pending_events()
+    
+    async def _flush_pending_events(self):
+        """Deliver all pending coalesced events (caller holds _delivery_lock)"""
+        pending, self._pending_events = self._pending_events, {}
+        self._pending_ready.clear()
+        
+        for event_type, data in pending.items():
+            await self._notify(event_type, data)
+    
+    async def _notify(self, event_type: str, data: str):
+        """Notify waiters and callbacks of an event"""
+        waiters = self._event_waiters.pop(event_type, None)
+        if waiters:
+            for future in waiters:
+                if not future.done():
+                    future.set_result(data)
+        
+        # Notify callbacks concurrently so a slow one doesn't hold up the rest
+        if not self.event_callbacks:
+            return
+        
+        results = await asyncio.gather(
+            *(callback(event_type, data) for callback in self.event_callbacks),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                self.logger.error(f"Error in event callback: {result}")
     
     def register_event_callback(self, callback: Callable):
         """Register a callback for Hyprland events"""
         self.event_callbacks.append(callback)
     
+    def expect_event(self, event_type: str) -> asyncio.Future:
+        """
+        Get a future resolved with the data of the next event of a type
+        
+        Call this before triggering the action that causes the event,
+        so a fast event is not missed.
+        
+        Args:
+            event_type: Event type as reported to callbacks (e.g. "window_focused")
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._event_waiters.setdefault(event_type, []).append(future)
+        future.add_done_callback(functools.partial(self._discard_waiter, event_type))
+        return future
+    
+    def _discard_waiter(self, event_type: str, future: asyncio.Future):
+        """Forget a waiter once it is resolved, cancelled or timed out"""
+        waiters = self._event_waiters.get(event_type)
+        if waiters and future in waiters:
+            waiters.remove(future)
+            if not waiters:
+                del self._event_waiters[event_type]
+    
+    async def wait_for_event(self, event_type: str, timeout: float) -> bool:
+        """Wait up to timeout seconds for the next event of a type"""
+        try:
+            await asyncio.wait_for(self.expect_event(event_type), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
     async def stop(self):
         """Stop event listener"""
         self.running = False
     
-    async def execute_command(self, command: str) -> str:
+    async def execute_command(self, command: str) -> bytes:
         """
         Execute a hyprctl command
         
@@ -113,56 +280,76 @@ class HyprlandConnector:
             command: Command to execute (e.g., "dispatch workspace 1")
             
         Returns:
-            str: Command output
+            bytes: Raw command output (JSON for query commands)
         """
+        # Hyprland serves one request per connection, so use a bare
+        # non-blocking socket rather than building a stream pair each time
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        
         try:
-            reader, writer = await asyncio.open_unix_connection(self.socket_path)
+            loop = asyncio.get_running_loop()
+            await loop.sock_connect(sock, self.socket_path)
             
             # Send command
-            writer.write(f"j/{command}".encode())
-            await writer.drain()
-            
-            # Read response
-            response = await reader.read(8192)
+            await loop.sock_sendall(sock, f"j/{command}".encode())
             
-            writer.close()
-            await writer.wait_closed()
+            # Read response until Hyprland closes the connection
+            chunks = []
+            while True:
+                chunk = await loop.sock_recv(sock, 65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
             
-            return response.decode('utf-8')
+            return b''.join(chunks)
             
         except Exception as e:
             self.logger.error(f"Error executing command '{command}': {e}")
-            return json.dumps({"error": str(e)})
+            return orjson.dumps({"error": str(e)})
+        finally:
+            sock.close()
     
-    async def get_state(self) -> Dict:
-        """Get comprehensive Hyprland state"""
-        state = {}
+    async def get_state(self, keys: Optional[Iterable[str]] = None) -> Dict:
+        """
+        Get comprehensive Hyprland state
         
-        try:
-            # Get active window
-            active_window = await self.execute_command("activewindow")
-            state['active_window'] = json.loads(active_window) if active_window else {}
-            
-            # Get workspace info
-            workspaces = await self.execute_command("workspaces")
-            state['workspaces'] = json.loads(workspaces) if workspaces else []
-            
-            # Get monitor info
-            monitors = await self.execute_command("monitors")
-            state['monitors'] = json.loads(monitors) if monitors else []
-            
-            # Get all clients (windows)
-            clients = await self.execute_command("clients")
-            state['clients'] = json.loads(clients) if clients else []
-            
-            # Get current workspace
-            active_workspace = await self.execute_command("activeworkspace")
-            state['workspace'] = json.loads(active_workspace) if active_workspace else {}
+        Served from the event-maintained cache; only slices invalidated by
+        events since the last call are queried again.
+        
+        Args:
+            keys: State slices to return (default: all of _STATE_COMMANDS)
+        """
+        # Materialize once; keys is walked more than once below
+        keys = tuple(self._STATE_COMMANDS if keys is None else keys)
+        
+        async with self._state_lock:
+            # Without the listener nothing invalidates the cache, so don't trust it
+            if self._listener_connected:
+                stale = [key for key in keys if key in self._dirty_slices]
+            else:
+                stale = list(keys)
             
-        except Exception as e:
-            self.logger.error(f"Error getting Hyprland state: {e}")
+            if stale:
+                # Clear before querying so events arriving meanwhile re-mark their slices
+                self._dirty_slices.difference_update(stale)
+                
+                # Query stale slices concurrently
+                results = await asyncio.gather(
+                    *(self.execute_command(self._STATE_COMMANDS[key]) for key in stale)
+                )
+                
+                for key, result in zip(stale, results):
+                    try:
+                        value = orjson.loads(result) if result else type(self._cached_state[key])()
+                        if isinstance(value, dict) and 'error' in value:
+                            raise RuntimeError(value['error'])
+                        self._cached_state[key] = value
+                    except Exception as e:
+                        self._dirty_slices.add(key)
+                        self.logger.error(f"Error getting Hyprland state '{key}': {e}")
         
-        return state
+        return {key: self._cached_state[key] for key in keys}
     
     async def dispatch(self, dispatcher: str, *args) -> bool:
         """
@@ -182,10 +369,13 @@ class HyprlandConnector:
             result = await self.execute_command(command)
             
             # Check for errors in response
-            if 'error' in result.lower():
-                self.logger.error(f"Dispatcher error: {result}")
+            if b'error' in result.lower():
+                self.logger.error(f"Dispatcher error: {result.decode('utf-8', 'replace')}")
                 return False
             
+            # Don't serve pre-dispatch state before the resulting events arrive
+            self._dirty_slices.update(self._STATE_COMMANDS)
+            
             self.logger.info(f"Executed dispatcher: {command}")
             return True
             
@@ -247,7 +437,7 @@ class HyprlandConnector:
         """Get information about the active window"""
         try:
             result = await self.execute_command('activewindow')
-            return json.loads(result) if result else {}
+            return orjson.loads(result) if result else {}
         except Exception as e:
             self.logger.error(f"Error getting active window: {e}")
             return {}
@@ -256,7 +446,7 @@ class HyprlandConnector:
         """Get all open windows"""
         try:
             result = await self.execute_command('clients')
-            return json.loads(result) if result else []
+            return orjson.loads(result) if result else []
         except Exception as e:
             self.logger.error(f"Error getting windows: {e}")
             return []
@@ -265,7 +455,7 @@ class HyprlandConnector:
         """Get all monitors"""
         try:
             result = await self.execute_command('monitors')
-            return json.loads(result) if result else []
+            return orjson.loads(result) if result else []
         except Exception as e:
             self.logger.error(f"Error getting monitors: {e}")
             return []
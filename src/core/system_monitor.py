@@ -4,11 +4,33 @@ CPU, memory, disk, network, battery, audio, etc.
 """
 
 import asyncio
+import heapq
 import logging
 import psutil
 import subprocess
 from typing import Dict, Optional
-from datetime import datetime
+import time
+
+# Native PulseAudio and D-Bus clients, pactl/bluetoothctl are used without them
+try:
+    import pulsectl_asyncio
+except ImportError:
+    pulsectl_asyncio = None
+
+try:
+    from dbus_next import BusType, Message, MessageType
+    from dbus_next.aio import MessageBus
+except ImportError:
+    MessageBus = None
+
+# Bytes to GiB
+_GiB = 1 / 1073741824
+
+# Disk usage changes slowly, refresh it at most this often
+DISK_USAGE_INTERVAL = 60  # seconds
+
+# After a failed native connect, use the subprocess fallback for this long
+NATIVE_RETRY_INTERVAL = 60  # seconds
 
 
 class SystemMonitor:
@@ -20,6 +42,27 @@ class SystemMonitor:
         self.current_state = {}
         self.update_interval = 5  # seconds
         
+        # Prime the CPU counters so non-blocking cpu_percent() has a baseline
+        psutil.cpu_percent(interval=None)
+        
+        # CPU count is fixed for the lifetime of the daemon
+        self._cpu_count = psutil.cpu_count()
+        
+        # Last disk usage reading as (monotonic time, usage)
+        self._last_disk = (float('-inf'), {})
+        
+        # Persistent PulseAudio and system bus connections (opened on first use)
+        self._pulse = None
+        self._system_bus = None
+        
+        # Monotonic time before which no native connect is attempted
+        self._pulse_retry_at = 0.0
+        self._bus_retry_at = 0.0
+        
+        # Serialize the lazy connects so overlapping gathers don't each open one
+        self._pulse_lock = asyncio.Lock()
+        self._bus_lock = asyncio.Lock()
+        
         self.logger.info("System monitor initialized")
     
     async def start_monitoring(self):
@@ -45,18 +88,31 @@ class SystemMonitor:
     
     async def _gather_system_state(self) -> Dict:
         """Gather comprehensive system information"""
+        # Subprocess-backed probes are independent, run them concurrently
+        network, audio, bluetooth = await asyncio.gather(
+            self._get_network_info(),
+            self._get_audio_info(),
+            self._get_bluetooth_info(),
+        )
+        
+        memory = psutil.virtual_memory()
+        
+        now = time.monotonic()
+        if now - self._last_disk[0] > DISK_USAGE_INTERVAL:
+            self._last_disk = (now, self._get_disk_usage())
+        
         state = {
-            'timestamp': datetime.now().isoformat(),
-            'cpu_percent': psutil.cpu_percent(interval=0.1),
-            'cpu_count': psutil.cpu_count(),
-            'memory_percent': psutil.virtual_memory().percent,
-            'memory_available_gb': round(psutil.virtual_memory().available / (1024**3), 2),
-            'memory_total_gb': round(psutil.virtual_memory().total / (1024**3), 2),
-            'disk_usage': self._get_disk_usage(),
-            'network': await self._get_network_info(),
+            'timestamp': time.time(),
+            'cpu_percent': psutil.cpu_percent(interval=None),  # Since the previous tick
+            'cpu_count': self._cpu_count,
+            'memory_percent': memory.percent,
+            'memory_available_gb': round(memory.available * _GiB, 2),
+            'memory_total_gb': round(memory.total * _GiB, 2),
+            'disk_usage': self._last_disk[1],
+            'network': network,
             'battery': self._get_battery_info(),
-            'audio': await self._get_audio_info(),
-            'bluetooth': await self._get_bluetooth_info(),
+            'audio': audio,
+            'bluetooth': bluetooth,
             'load_average': psutil.getloadavg(),
             'uptime_seconds': self._get_uptime(),
         }
@@ -68,9 +124,9 @@ class SystemMonitor:
         try:
             usage = psutil.disk_usage('/')
             return {
-                'total_gb': round(usage.total / (1024**3), 2),
-                'used_gb': round(usage.used / (1024**3), 2),
-                'free_gb': round(usage.free / (1024**3), 2),
+                'total_gb': round(usage.total * _GiB, 2),
+                'used_gb': round(usage.used * _GiB, 2),
+                'free_gb': round(usage.free * _GiB, 2),
                 'percent': usage.percent
             }
         except Exception as e:
@@ -129,6 +185,15 @@ class SystemMonitor:
     
     async def _get_audio_info(self) -> Dict:
         """Get audio volume and mute status"""
+        if pulsectl_asyncio is not None and time.monotonic() >= self._pulse_retry_at:
+            try:
+                return await self._get_audio_info_native()
+            except Exception as e:
+                self.logger.debug(f"PulseAudio query failed, falling back to pactl: {e}")
+                if self._pulse is not None:
+                    self._pulse.close()
+                    self._pulse = None
+        
         try:
             # Get volume using pactl
             proc = await asyncio.create_subprocess_exec(
@@ -164,8 +229,48 @@ class SystemMonitor:
             self.logger.error(f"Error getting audio info: {e}")
             return {'volume': 0, 'muted': False}
     
+    async def _get_audio_info_native(self) -> Dict:
+        """Query the default sink over a persistent PulseAudio connection"""
+        if self._pulse is None:
+            await self._connect_pulse()
+        
+        server_info = await self._pulse.server_info()
+        sink = await self._pulse.get_sink_by_name(server_info.default_sink_name)
+        
+        return {
+            'volume': round(sink.volume.value_flat * 100),
+            'muted': bool(sink.mute)
+        }
+    
+    async def _connect_pulse(self):
+        """Open the PulseAudio connection, unless a concurrent caller already has"""
+        async with self._pulse_lock:
+            if self._pulse is not None:
+                return
+            if time.monotonic() < self._pulse_retry_at:
+                raise RuntimeError("PulseAudio connect failed recently")
+            
+            pulse = pulsectl_asyncio.PulseAsync('hypr-ai-monitor')
+            try:
+                await pulse.connect()
+            except Exception:
+                # Release the context and loop readers, and don't retry every tick
+                pulse.close()
+                self._pulse_retry_at = time.monotonic() + NATIVE_RETRY_INTERVAL
+                raise
+            self._pulse = pulse
+    
     async def _get_bluetooth_info(self) -> Dict:
         """Get Bluetooth status"""
+        if MessageBus is not None and time.monotonic() >= self._bus_retry_at:
+            try:
+                return await self._get_bluetooth_info_native()
+            except Exception as e:
+                self.logger.debug(f"BlueZ query failed, falling back to bluetoothctl: {e}")
+                if self._system_bus is not None:
+                    self._system_bus.disconnect()
+                    self._system_bus = None
+        
         try:
             proc = await asyncio.create_subprocess_exec(
                 'bluetoothctl', 'show',
@@ -185,34 +290,72 @@ class SystemMonitor:
             self.logger.debug(f"Bluetooth not available: {e}")
             return {'powered': False, 'available': False}
     
+    async def _get_bluetooth_info_native(self) -> Dict:
+        """Read the adapter power state from BlueZ over the system bus"""
+        if self._system_bus is None:
+            await self._connect_system_bus()
+        
+        reply = await self._system_bus.call(Message(
+            destination='org.bluez',
+            path='/org/bluez/hci0',
+            interface='org.freedesktop.DBus.Properties',
+            member='Get',
+            signature='ss',
+            body=['org.bluez.Adapter1', 'Powered']
+        ))
+        
+        # No adapter (or BlueZ not running)
+        if reply.message_type == MessageType.ERROR:
+            return {'powered': False, 'available': False}
+        
+        return {
+            'powered': bool(reply.body[0].value),
+            'available': True
+        }
+    
+    async def _connect_system_bus(self):
+        """Open the system bus connection, unless a concurrent caller already has"""
+        async with self._bus_lock:
+            if self._system_bus is not None:
+                return
+            if time.monotonic() < self._bus_retry_at:
+                raise RuntimeError("System bus connect failed recently")
+            
+            bus = None
+            try:
+                # The constructor already opens the bus socket
+                bus = MessageBus(bus_type=BusType.SYSTEM)
+                await bus.connect()
+            except Exception:
+                # Close the half-open socket, and don't retry every tick
+                if bus is not None:
+                    try:
+                        bus.disconnect()
+                    except Exception:
+                        pass
+                self._bus_retry_at = time.monotonic() + NATIVE_RETRY_INTERVAL
+                raise
+            self._system_bus = bus
+    
     def _get_uptime(self) -> int:
         """Get system uptime in seconds"""
         try:
-            with open('/proc/uptime', 'r') as f:
-                uptime_seconds = float(f.readline().split()[0])
-                return int(uptime_seconds)
+            # Same clock /proc/uptime reports, without opening and parsing the file
+            return int(time.clock_gettime(time.CLOCK_BOOTTIME))
         except Exception:
             return 0
     
     async def get_running_processes(self, limit: int = 20) -> list:
         """Get list of running processes sorted by CPU usage"""
         try:
-            processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-                try:
-                    info = proc.info
-                    processes.append({
-                        'pid': info['pid'],
-                        'name': info['name'],
-                        'cpu_percent': info['cpu_percent'],
-                        'memory_percent': info['memory_percent']
-                    })
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
+            # proc.info already holds just the requested fields
+            processes = (
+                proc.info
+                for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent'], ad_value=None)
+            )
             
-            # Sort by CPU usage
-            processes.sort(key=lambda x: x['cpu_percent'], reverse=True)
-            return processes[:limit]
+            # Top processes by CPU usage
+            return heapq.nlargest(limit, processes, key=lambda info: info['cpu_percent'] or 0)
         except Exception as e:
             self.logger.error(f"Error getting processes: {e}")
             return []
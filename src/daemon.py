@@ -8,10 +8,10 @@ import asyncio
 import signal
 import sys
 import os
+import time
 import logging
 from pathlib import Path
-from datetime import datetime
-import json
+import orjson
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent))
@@ -25,6 +25,10 @@ from ai.gemini_client import GeminiClient
 from utils.config import Config
 from utils.logger import setup_logger
 
+# Longest wait for Hyprland to confirm an action before running the next one
+ACTION_SETTLE_TIMEOUT = 0.1  # seconds
+
+
 class AIAutomatorDaemon:
     """Main daemon orchestrating all subsystems"""
     
@@ -48,38 +52,53 @@ class AIAutomatorDaemon:
         )
         
         self.running = False
-        self.tasks = []
+        self._main_task = None
+        
+        # Bumped whenever commands or conversations are recorded
+        self.history_version = 0
         
-        # Setup signal handlers
-        signal.signal(signal.SIGINT, self._signal_handler)
-        signal.signal(signal.SIGTERM, self._signal_handler)
+        # Set on shutdown to wake periodic tasks immediately
+        self._stop_event = asyncio.Event()
         
         self.logger.info("AI Automator Daemon initialized")
     
-    def _signal_handler(self, signum, frame):
+    def _signal_handler(self, signum):
         """Handle shutdown signals gracefully"""
         self.logger.info(f"Received signal {signum}, initiating shutdown...")
         self.running = False
+        self._stop_event.set()
+        
+        # Cancelling start() tears down its task group, then it runs stop()
+        if self._main_task:
+            self._main_task.cancel()
     
     async def start(self):
         """Start all daemon subsystems"""
         self.running = True
         self.logger.info("Starting AI Automator Daemon...")
         
+        # Setup signal handlers on the event loop
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self._signal_handler, sig)
+        
+        self._main_task = asyncio.current_task()
+        
         try:
-            # Start subsystems
-            self.tasks = [
-                asyncio.create_task(self.hyprland.start_event_listener(), name="hyprland_events"),
-                asyncio.create_task(self.system_monitor.start_monitoring(), name="system_monitor"),
-                asyncio.create_task(self.web_server.start(), name="web_server"),
-                asyncio.create_task(self._periodic_context_update(), name="context_updater"),
-            ]
-            
-            self.logger.info(f"All subsystems started. Dashboard: http://{self.config.host}:{self.config.port}")
-            
-            # Wait for all tasks
-            await asyncio.gather(*self.tasks, return_exceptions=True)
+            # Start subsystems; if one crashes the others are cancelled and the error propagates
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(self.hyprland.start_event_listener(), name="hyprland_events")
+                tg.create_task(self.system_monitor.start_monitoring(), name="system_monitor")
+                tg.create_task(self.web_server.start(), name="web_server")
+                tg.create_task(self._periodic_context_update(), name="context_updater")
+                
+                self.logger.info(f"All subsystems started. Dashboard: http://{self.config.host}:{self.config.port}")
             
+        except asyncio.CancelledError:
+            if self.running:
+                raise
+            # Shutdown requested by a signal
+            self._main_task.uncancel()
         except Exception as e:
             self.logger.error(f"Fatal error in daemon: {e}", exc_info=True)
             raise
@@ -90,15 +109,11 @@ class AIAutomatorDaemon:
         """Stop all subsystems gracefully"""
         self.logger.info("Stopping AI Automator Daemon...")
         self.running = False
+        self._stop_event.set()
         
-        # Cancel all tasks
-        for task in self.tasks:
-            if not task.done():
-                task.cancel()
-                try:
-                    await task
-                except asyncio.CancelledError:
-                    pass
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(sig)
         
         # Stop subsystems
         await self.web_server.stop()
@@ -118,18 +133,25 @@ class AIAutomatorDaemon:
                 self.context_manager.update_system_state(state)
                 
                 # Sleep for 30 seconds
-                await asyncio.sleep(30)
+                await self._wait_for_stop(30)
                 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 self.logger.error(f"Error in context updater: {e}")
-                await asyncio.sleep(30)
+                await self._wait_for_stop(30)
+    
+    async def _wait_for_stop(self, timeout: float):
+        """Sleep for up to timeout seconds, waking early on shutdown"""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
     
     async def get_system_state(self):
         """Gather complete system state for AI context"""
         state = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': time.time(),
             'hyprland': await self.hyprland.get_state(),
             'system': await self.system_monitor.get_state(),
             'keybindings': self.context_manager.get_keybindings(),
@@ -137,6 +159,18 @@ class AIAutomatorDaemon:
         }
         return state
     
+    async def get_status_projection(self):
+        """Gather only the state shown by the dashboard status view"""
+        system, hyprland = await asyncio.gather(
+            self.system_monitor.get_state(),
+            self.hyprland.get_state(('active_window', 'workspace')),
+        )
+        return {
+            'timestamp': time.time(),
+            'system': system,
+            'hyprland': hyprland,
+        }
+    
     async def process_user_query(self, query: str, include_screenshot: bool = False):
         """
         Process a user query through the AI pipeline
@@ -170,7 +204,8 @@ class AIAutomatorDaemon:
             
             # Store in conversation history
             self.context_manager.add_conversation(query, 'user')
-            self.context_manager.add_conversation(json.dumps(result), 'assistant')
+            self.context_manager.add_conversation(orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS).decode(), 'assistant')
+            self.history_version += 1
             
             return result
             
@@ -199,8 +234,9 @@ class AIAutomatorDaemon:
         }
         
         if screenshot_data:
-            import base64
-            context['screenshot'] = base64.b64encode(screenshot_data).decode('utf-8')
+            # Raw image bytes, Gemini receives them as an inline Part
+            context['screenshot_bytes'] = screenshot_data
+            context['screenshot_mime'] = 'image/png'
         
         return context
     
@@ -214,7 +250,12 @@ class AIAutomatorDaemon:
         self.logger.info(f"Executing {len(actions)} actions: {explanation}")
         
         for action in actions:
+            settled = None
             try:
+                # Register before executing so a fast confirmation is not missed
+                settle_event = self.action_dispatcher.get_settle_event(action)
+                settled = self.hyprland.expect_event(settle_event) if settle_event else None
+                
                 result = await self.action_dispatcher.execute(action)
                 results.append({
                     'action': action,
@@ -228,12 +269,25 @@ class AIAutomatorDaemon:
                     output=result.get('output', ''),
                     success=result['success']
                 )
+                self.history_version += 1
                 
-                # Small delay between actions
-                await asyncio.sleep(0.1)
+                # Let Hyprland settle after actions that change compositor state
+                if settled is not None:
+                    if result['success']:
+                        try:
+                            await asyncio.wait_for(settled, timeout=ACTION_SETTLE_TIMEOUT)
+                        except asyncio.TimeoutError:
+                            pass
+                    else:
+                        settled.cancel()
                 
             except Exception as e:
                 self.logger.error(f"Error executing action {action}: {e}")
+                
+                # Don't leave the waiter registered with the connector
+                if settled is not None:
+                    settled.cancel()
+                
                 results.append({
                     'action': action,
                     'success': False,
@@ -244,7 +298,7 @@ class AIAutomatorDaemon:
             'success': all(r['success'] for r in results),
             'explanation': explanation,
             'actions': results,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': time.time()
         }
 
 
@@ -262,8 +316,11 @@ async def main():
 
 
 if __name__ == '__main__':
-    # Set event loop policy for compatibility
-    if sys.platform == 'linux':
-        asyncio.set_event_loop_policy(asyncio.DefaultEventLoopPolicy())
+    # Use the libuv-based event loop when available
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     
     asyncio.run(main())
\ No newline at end of file
@@ -4,48 +4,101 @@ Serves dashboard and handles real-time communication
 """
 
 import asyncio
-import json
+import hashlib
 import logging
-from typing import Set
+import resource
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
 from pathlib import Path
 
+import orjson
+
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi.responses import Response, HTMLResponse, ORJSONResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
+# Outbound messages buffered per client before broadcasts to it are dropped
+CLIENT_QUEUE_SIZE = 64
+
+# Most connections (HTTP and WebSocket) served at once before new ones get 503
+MAX_CONCURRENCY = 1024
+
+# Daemon state is reused for this long across concurrent status/state requests
+STATE_CACHE_TTL = 0.2  # seconds
+
+
+def _dumps(message: dict) -> bytes:
+    """Serialize a message for the wire"""
+    return orjson.dumps(message, option=orjson.OPT_NON_STR_KEYS)
+
+
+# Fixed WebSocket messages, encoded once
+_CONNECTED = _dumps({'type': 'connected', 'message': 'Connected to AI Automator'})
+_PROCESSING = _dumps({'type': 'processing', 'message': 'Processing your request...'})
+_PONG = _dumps({'type': 'pong'})
+
+
+def _etag_response(request: Request, obj) -> Response:
+    """JSON response tagged with a content hash; 304 if the client already has it"""
+    body = _dumps(obj)
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
 
 class WebServer:
     """FastAPI web server for dashboard and API"""
     
-    def __init__(self, host: str, port: int, daemon):
+    def __init__(self, host: str, port: int, daemon, enable_cors: bool = False):
         self.logger = logging.getLogger('web_server')
         self.host = host
         self.port = port
         self.daemon = daemon
         
-        # Active WebSocket connections
-        self.active_connections: Set[WebSocket] = set()
+        # Active WebSocket connections and their outbound message queues
+        self.clients: Dict[WebSocket, asyncio.Queue] = {}
         
-        # Create FastAPI app
-        self.app = FastAPI(title="Hyprland AI Automator")
+        # Serialized /api/history body and the daemon history version it reflects
+        self._history_cache: Optional[Tuple[int, bytes]] = None
         
-        # Add CORS middleware
-        self.app.add_middleware(
-            CORSMiddleware,
-            allow_origins=["*"],
-            allow_credentials=True,
-            allow_methods=["*"],
-            allow_headers=["*"],
-        )
+        # Recently fetched daemon state (name -> (loop time, state)), each refreshed
+        # under its own lock so a cheap status poll never waits on a full state fetch
+        self._state_cache: Dict[str, Tuple[float, dict]] = {}
+        self._state_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
         
-        # Setup routes
-        self._setup_routes()
+        # WebSocket message type -> handler
+        self._ws_handlers = {
+            'query': self._ws_query,
+            'ping': self._ws_ping,
+            'get_state': self._ws_state,
+        }
+        
+        # Create FastAPI app
+        self.app = FastAPI(title="Hyprland AI Automator", default_response_class=ORJSONResponse)
+        
+        # Add CORS middleware only when the API is used from another origin;
+        # the bundled dashboard is same-origin and doesn't need it
+        if enable_cors:
+            self.app.add_middleware(
+                CORSMiddleware,
+                allow_origins=["*"],
+                allow_credentials=True,
+                allow_methods=["*"],
+                allow_headers=["*"],
+            )
         
         # Static files directory
         self.static_dir = Path(__file__).parent / 'static'
-        self.static_dir.mkdir(exist_ok=True)
+        
+        # Dashboard page, checked once rather than on every request
+        self._index_path = self.static_dir / 'index.html'
+        self._serve_static_index = self._index_path.is_file()
+        
+        # Setup routes
+        self._setup_routes()
         
         self.server = None
         self.logger.info(f"Web server initialized on {host}:{port}")
@@ -53,55 +106,53 @@ class WebServer:
     def _setup_routes(self):
         """Setup FastAPI routes"""
         
+        # Other static assets are served straight from disk by Starlette
+        self.app.mount("/static", StaticFiles(directory=self.static_dir, check_dir=False), name="static")
+        
         @self.app.get("/")
         async def root():
             """Serve main dashboard"""
-            html_path = Path(__file__).parent / 'static' / 'index.html'
-            if html_path.exists():
-                return FileResponse(html_path)
-            return HTMLResponse(self._get_default_html())
+            if self._serve_static_index:
+                return FileResponse(self._index_path)
+            # A fresh response per request: FastAPI attaches background tasks to it
+            return HTMLResponse(_DEFAULT_HTML_BYTES, headers={"Cache-Control": "public, max-age=3600"})
         
         @self.app.get("/api/status")
         async def get_status():
             """Get system status"""
             try:
-                state = await self.daemon.get_system_state()
-                return JSONResponse({
-                    'status': 'online',
-                    'timestamp': state.get('timestamp'),
-                    'system': state.get('system', {}),
-                    'hyprland': {
-                        'active_window': state.get('hyprland', {}).get('active_window', {}),
-                        'workspace': state.get('hyprland', {}).get('workspace', {})
-                    }
-                })
+                status = await self._cached_state('status', self.daemon.get_status_projection)
+                return ORJSONResponse({'status': 'online', **status})
             except Exception as e:
-                return JSONResponse({
+                return ORJSONResponse({
                     'status': 'error',
                     'error': str(e)
                 }, status_code=500)
         
         @self.app.get("/api/keybindings")
-        async def get_keybindings():
+        async def get_keybindings(request: Request):
             """Get configured keybindings"""
             keybindings = self.daemon.context_manager.get_keybindings()
-            return JSONResponse({'keybindings': keybindings})
+            return _etag_response(request, {'keybindings': keybindings})
         
         @self.app.get("/api/history")
         async def get_history():
             """Get command and conversation history"""
-            commands = self.daemon.context_manager.get_recent_commands(limit=20)
-            conversations = self.daemon.context_manager.get_conversation_history(limit=50)
-            return JSONResponse({
-                'commands': commands,
-                'conversations': conversations
-            })
+            version = self.daemon.history_version
+            if self._history_cache is None or self._history_cache[0] != version:
+                commands = self.daemon.context_manager.get_recent_commands(limit=20)
+                conversations = self.daemon.context_manager.get_conversation_history(limit=50)
+                self._history_cache = (version, _dumps({
+                    'commands': commands,
+                    'conversations': conversations
+                }))
+            return Response(content=self._history_cache[1], media_type="application/json")
         
         @self.app.get("/api/stats")
-        async def get_stats():
+        async def get_stats(request: Request):
             """Get system statistics"""
             stats = self.daemon.context_manager.get_system_stats()
-            return JSONResponse(stats)
+            return _etag_response(request, stats)
         
         @self.app.websocket("/ws")
         async def websocket_endpoint(websocket: WebSocket):
@@ -111,87 +162,171 @@ class WebServer:
     async def _handle_websocket(self, websocket: WebSocket):
         """Handle WebSocket connection"""
         await websocket.accept()
-        self.active_connections.add(websocket)
+        
+        # A dedicated sender task owns all writes, so a slow client only delays itself
+        queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        sender = asyncio.create_task(self._sender_loop(websocket, queue))
+        self.clients[websocket] = queue
         
         try:
-            self.logger.info(f"WebSocket client connected (total: {len(self.active_connections)})")
+            self.logger.info(f"WebSocket client connected (total: {len(self.clients)})")
             
             # Send welcome message
-            await websocket.send_json({
-                'type': 'connected',
-                'message': 'Connected to AI Automator'
-            })
+            await self._send_bytes(websocket, _CONNECTED)
             
             while True:
-                # Receive message from client
-                data = await websocket.receive_json()
-                
-                message_type = data.get('type')
+                # Receive message from client (binary frames, or text from older pages)
+                message = await websocket.receive()
+                if message['type'] == 'websocket.disconnect':
+                    raise WebSocketDisconnect(message.get('code', 1000))
+                raw = message.get('bytes')
+                data = orjson.loads(raw if raw is not None else message.get('text'))
                 
-                if message_type == 'query':
-                    # Process AI query
-                    query = data.get('query', '')
-                    include_screenshot = data.get('screenshot', False)
-                    
-                    # Send processing status
-                    await websocket.send_json({
-                        'type': 'processing',
-                        'message': 'Processing your request...'
-                    })
-                    
-                    # Process through daemon
-                    result = await self.daemon.process_user_query(query, include_screenshot)
-                    
-                    # Send result
-                    await websocket.send_json({
-                        'type': 'result',
-                        'result': result
-                    })
-                
-                elif message_type == 'ping':
-                    await websocket.send_json({'type': 'pong'})
-                
-                elif message_type == 'get_state':
-                    state = await self.daemon.get_system_state()
-                    await websocket.send_json({
-                        'type': 'state',
-                        'state': state
-                    })
+                handler = self._ws_handlers.get(data.get('type'))
+                if handler:
+                    await handler(websocket, data)
                 
         except WebSocketDisconnect:
             self.logger.info("WebSocket client disconnected")
         except Exception as e:
             self.logger.error(f"WebSocket error: {e}")
         finally:
-            self.active_connections.discard(websocket)
+            self.clients.pop(websocket, None)
+            sender.cancel()
+    
+    async def _ws_query(self, websocket: WebSocket, data: dict):
+        """Process an AI query"""
+        query = data.get('query', '')
+        include_screenshot = data.get('screenshot', False)
+        
+        # Send processing status
+        await self._send_bytes(websocket, _PROCESSING)
+        
+        # Process through daemon
+        result = await self.daemon.process_user_query(query, include_screenshot)
+        
+        # Send result
+        await self._send(websocket, {
+            'type': 'result',
+            'result': result
+        })
+    
+    async def _ws_ping(self, websocket: WebSocket, data: dict):
+        """Answer a keepalive ping"""
+        await self._send_bytes(websocket, _PONG)
+    
+    async def _ws_state(self, websocket: WebSocket, data: dict):
+        """Send the current system state"""
+        state = await self._cached_state('state', self.daemon.get_system_state)
+        await self._send(websocket, {
+            'type': 'state',
+            'state': state
+        })
+    
+    async def _cached_state(self, name: str, fetch: Callable[[], Awaitable[dict]]) -> dict:
+        """Return daemon state fetched within STATE_CACHE_TTL, so concurrent callers share one fetch"""
+        loop = asyncio.get_running_loop()
+        
+        cached = self._state_cache.get(name)
+        if cached and loop.time() - cached[0] < STATE_CACHE_TTL:
+            return cached[1]
+        
+        async with self._state_locks[name]:
+            # Another caller may have refreshed it while we waited
+            cached = self._state_cache.get(name)
+            if cached and loop.time() - cached[0] < STATE_CACHE_TTL:
+                return cached[1]
+            
+            state = await fetch()
+            self._state_cache[name] = (loop.time(), state)
+            return state
+    
+    async def _sender_loop(self, websocket: WebSocket, queue: asyncio.Queue):
+        """Write queued messages to one client until it goes away"""
+        try:
+            while True:
+                payload = await queue.get()
+                
+                # Merge whatever else piled up meanwhile into a single frame
+                if not queue.empty():
+                    batch = [payload]
+                    while not queue.empty():
+                        batch.append(queue.get_nowait())
+                    payload = b'{"type":"batch","messages":[' + b','.join(batch) + b']}'
+                
+                await websocket.send_bytes(payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Error sending to client: {e}")
+            # Stop accepting messages for it, release any blocked _send, and end its receive loop
+            self.clients.pop(websocket, None)
+            while not queue.empty():
+                queue.get_nowait()
+            try:
+                await websocket.close()
+            except Exception:
+                pass
+    
+    async def _send(self, websocket: WebSocket, message: dict):
+        """Queue a message for one client as an orjson-encoded binary frame"""
+        await self._send_bytes(websocket, _dumps(message))
+    
+    async def _send_bytes(self, websocket: WebSocket, payload: bytes):
+        """Queue an already-encoded message for one client"""
+        queue = self.clients.get(websocket)
+        if queue is not None:
+            await queue.put(payload)
     
     async def broadcast(self, message: dict):
         """Broadcast message to all connected clients"""
-        if not self.active_connections:
+        if not self.clients:
             return
         
-        disconnected = set()
-        
-        for websocket in self.active_connections:
+        # Serialize once; each client's sender task does the actual write
+        payload = _dumps(message)
+        dropped = 0
+        for queue in self.clients.values():
             try:
-                await websocket.send_json(message)
-            except Exception as e:
-                self.logger.error(f"Error broadcasting to client: {e}")
-                disconnected.add(websocket)
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                dropped += 1
         
-        # Remove disconnected clients
-        self.active_connections -= disconnected
+        # Report drops once per broadcast rather than once per client
+        if dropped:
+            self.logger.warning(f"Dropped broadcast for {dropped} client(s) with full outbound queues")
     
     async def start(self):
         """Start the web server"""
         self.logger.info(f"Starting web server on {self.host}:{self.port}")
         
+        # Every connection holds a file descriptor
+        soft_limit, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft_limit != resource.RLIM_INFINITY and soft_limit < MAX_CONCURRENCY + 64:
+            self.logger.warning(
+                f"Open file limit is {soft_limit}; raise it (e.g. ulimit -n 4096 or "
+                f"LimitNOFILE= in the service unit) to serve {MAX_CONCURRENCY} connections"
+            )
+        
         config = uvicorn.Config(
             self.app,
             host=self.host,
             port=self.port,
             log_level="info",
-            access_log=False
+            access_log=False,
+            # uvloop only applies when uvicorn owns the loop; when run from the
+            # daemon the loop it already installed is used
+            loop="uvloop",
+            http="httptools",
+            ws="websockets",
+            # The dashboard is served locally; compressing each frame only costs CPU
+            ws_per_message_deflate=False,
+            ws_max_size=2 ** 20,
+            ws_ping_interval=20,
+            ws_ping_timeout=20,
+            backlog=2048,
+            limit_concurrency=MAX_CONCURRENCY,
+            timeout_keep_alive=30
         )
         
         self.server = uvicorn.Server(config)
@@ -202,246 +337,252 @@ class WebServer:
         if self.server:
             self.logger.info("Stopping web server...")
             self.server.should_exit = True
-    
-    def _get_default_html(self) -> str:
-        """Return default HTML if static file not found"""
-        return """
-        <!DOCTYPE html>
-        <html lang="en">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Hyprland AI Automator</title>
-            <style>
-                * { margin: 0; padding: 0; box-sizing: border-box; }
-                body {
-                    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    min-height: 100vh;
-                    display: flex;
-                    justify-content: center;
-                    align-items: center;
-                    padding: 20px;
-                }
-                .container {
-                    background: white;
-                    border-radius: 20px;
-                    box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-                    max-width: 800px;
-                    width: 100%;
-                    padding: 40px;
-                }
-                h1 {
-                    color: #667eea;
-                    margin-bottom: 10px;
-                }
-                .subtitle {
-                    color: #666;
-                    margin-bottom: 30px;
-                }
-                .status {
-                    display: flex;
-                    align-items: center;
-                    gap: 10px;
-                    padding: 15px;
-                    background: #f0f4ff;
-                    border-radius: 10px;
-                    margin-bottom: 30px;
-                }
-                .status-dot {
-                    width: 12px;
-                    height: 12px;
-                    border-radius: 50%;
-                    background: #4CAF50;
-                    animation: pulse 2s infinite;
-                }
-                @keyframes pulse {
-                    0%, 100% { opacity: 1; }
-                    50% { opacity: 0.5; }
-                }
-                .chat-container {
-                    border: 2px solid #e0e0e0;
-                    border-radius: 15px;
-                    height: 400px;
-                    display: flex;
-                    flex-direction: column;
-                }
-                .messages {
-                    flex: 1;
-                    overflow-y: auto;
-                    padding: 20px;
-                }
-                .message {
-                    margin-bottom: 15px;
-                    padding: 12px 16px;
-                    border-radius: 12px;
-                    max-width: 80%;
-                }
-                .message.user {
-                    background: #667eea;
-                    color: white;
-                    margin-left: auto;
-                }
-                .message.assistant {
-                    background: #f0f0f0;
-                    color: #333;
-                }
-                .input-container {
-                    display: flex;
-                    gap: 10px;
-                    padding: 15px;
-                    border-top: 2px solid #e0e0e0;
-                }
-                input {
-                    flex: 1;
-                    padding: 12px;
-                    border: 2px solid #e0e0e0;
-                    border-radius: 10px;
-                    font-size: 14px;
-                }
-                input:focus {
-                    outline: none;
-                    border-color: #667eea;
-                }
-                button {
-                    padding: 12px 24px;
-                    background: #667eea;
-                    color: white;
-                    border: none;
-                    border-radius: 10px;
-                    cursor: pointer;
-                    font-size: 14px;
-                    font-weight: 600;
-                    transition: background 0.3s;
-                }
-                button:hover {
-                    background: #5568d3;
-                }
-                button:disabled {
-                    background: #ccc;
-                    cursor: not-allowed;
-                }
-                .info {
-                    margin-top: 20px;
-                    padding: 15px;
-                    background: #f9f9f9;
-                    border-radius: 10px;
-                    font-size: 14px;
-                    color: #666;
-                }
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>🤖 Hyprland AI Automator</h1>
-                <p class="subtitle">AI-powered desktop automation for Arch Linux</p>
-                
-                <div class="status">
-                    <div class="status-dot"></div>
-                    <span id="status-text">Connected to daemon</span>
-                </div>
-                
-                <div class="chat-container">
-                    <div class="messages" id="messages"></div>
-                    <div class="input-container">
-                        <input type="text" id="query-input" placeholder="Ask me to do something..." />
-                        <button id="send-btn" onclick="sendQuery()">Send</button>
-                    </div>
-                </div>
-                
-                <div class="info">
-                    <strong>Try commands like:</strong><br>
-                    • "Open Firefox and navigate to GitHub"<br>
-                    • "Take a screenshot and save it"<br>
-                    • "Show me my system resources"<br>
-                    • "Switch to workspace 2 and open a terminal"
-                </div>
+
+
+# Fallback dashboard, encoded once at import
+_DEFAULT_HTML_BYTES: bytes = """
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Hyprland AI Automator</title>
+    <style>
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body {
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            min-height: 100vh;
+            display: flex;
+            justify-content: center;
+            align-items: center;
+            padding: 20px;
+        }
+        .container {
+            background: white;
+            border-radius: 20px;
+            box-shadow: 0 20px 60px rgba(0,0,0,0.3);
+            max-width: 800px;
+            width: 100%;
+            padding: 40px;
+        }
+        h1 {
+            color: #667eea;
+            margin-bottom: 10px;
+        }
+        .subtitle {
+            color: #666;
+            margin-bottom: 30px;
+        }
+        .status {
+            display: flex;
+            align-items: center;
+            gap: 10px;
+            padding: 15px;
+            background: #f0f4ff;
+            border-radius: 10px;
+            margin-bottom: 30px;
+        }
+        .status-dot {
+            width: 12px;
+            height: 12px;
+            border-radius: 50%;
+            background: #4CAF50;
+            animation: pulse 2s infinite;
+        }
+        @keyframes pulse {
+            0%, 100% { opacity: 1; }
+            50% { opacity: 0.5; }
+        }
+        .chat-container {
+            border: 2px solid #e0e0e0;
+            border-radius: 15px;
+            height: 400px;
+            display: flex;
+            flex-direction: column;
+        }
+        .messages {
+            flex: 1;
+            overflow-y: auto;
+            padding: 20px;
+        }
+        .message {
+            margin-bottom: 15px;
+            padding: 12px 16px;
+            border-radius: 12px;
+            max-width: 80%;
+        }
+        .message.user {
+            background: #667eea;
+            color: white;
+            margin-left: auto;
+        }
+        .message.assistant {
+            background: #f0f0f0;
+            color: #333;
+        }
+        .input-container {
+            display: flex;
+            gap: 10px;
+            padding: 15px;
+            border-top: 2px solid #e0e0e0;
+        }
+        input {
+            flex: 1;
+            padding: 12px;
+            border: 2px solid #e0e0e0;
+            border-radius: 10px;
+            font-size: 14px;
+        }
+        input:focus {
+            outline: none;
+            border-color: #667eea;
+        }
+        button {
+            padding: 12px 24px;
+            background: #667eea;
+            color: white;
+            border: none;
+            border-radius: 10px;
+            cursor: pointer;
+            font-size: 14px;
+            font-weight: 600;
+            transition: background 0.3s;
+        }
+        button:hover {
+            background: #5568d3;
+        }
+        button:disabled {
+            background: #ccc;
+            cursor: not-allowed;
+        }
+        .info {
+            margin-top: 20px;
+            padding: 15px;
+            background: #f9f9f9;
+            border-radius: 10px;
+            font-size: 14px;
+            color: #666;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>🤖 Hyprland AI Automator</h1>
+        <p class="subtitle">AI-powered desktop automation for Arch Linux</p>
+
+        <div class="status">
+            <div class="status-dot"></div>
+            <span id="status-text">Connected to daemon</span>
+        </div>
+
+        <div class="chat-container">
+            <div class="messages" id="messages"></div>
+            <div class="input-container">
+                <input type="text" id="query-input" placeholder="Ask me to do something..." />
+                <button id="send-btn" onclick="sendQuery()">Send</button>
             </div>
-            
-            <script>
-                let ws = null;
-                
-                function connect() {
-                    ws = new WebSocket(`ws://${window.location.host}/ws`);
-                    
-                    ws.onopen = () => {
-                        console.log('Connected to server');
-                        document.getElementById('status-text').textContent = 'Connected to daemon';
-                    };
-                    
-                    ws.onmessage = (event) => {
-                        const data = JSON.parse(event.data);
-                        handleMessage(data);
-                    };
-                    
-                    ws.onerror = (error) => {
-                        console.error('WebSocket error:', error);
-                        document.getElementById('status-text').textContent = 'Connection error';
-                    };
-                    
-                    ws.onclose = () => {
-                        console.log('Disconnected from server');
-                        document.getElementById('status-text').textContent = 'Disconnected';
-                        setTimeout(connect, 3000);
-                    };
-                }
-                
-                function handleMessage(data) {
-                    const messagesDiv = document.getElementById('messages');
-                    
-                    if (data.type === 'result') {
-                        const result = data.result;
-                        addMessage('assistant', result.explanation || 'Done!');
-                        
-                        if (result.actions && result.actions.length > 0) {
-                            const actionsSummary = result.actions.map(a => 
-                                `${a.success ? '✓' : '✗'} ${JSON.stringify(a.action).substring(0, 50)}...`
-                            ).join('<br>');
-                            addMessage('assistant', actionsSummary, true);
-                        }
-                    } else if (data.type === 'processing') {
-                        addMessage('assistant', data.message);
-                    }
-                }
-                
-                function addMessage(role, content, isHtml = false) {
-                    const messagesDiv = document.getElementById('messages');
-                    const messageDiv = document.createElement('div');
-                    messageDiv.className = `message ${role}`;
-                    
-                    if (isHtml) {
-                        messageDiv.innerHTML = content;
-                    } else {
-                        messageDiv.textContent = content;
-                    }
-                    
-                    messagesDiv.appendChild(messageDiv);
-                    messagesDiv.scrollTop = messagesDiv.scrollHeight;
-                }
-                
-                function sendQuery() {
-                    const input = document.getElementById('query-input');
-                    const query = input.value.trim();
-                    
-                    if (!query || !ws || ws.readyState !== WebSocket.OPEN) return;
-                    
-                    addMessage('user', query);
-                    
-                    ws.send(JSON.stringify({
-                        type: 'query',
-                        query: query,
-                        screenshot: false
-                    }));
-                    
-                    input.value = '';
+        </div>
+
+        <div class="info">
+            <strong>Try commands like:</strong><br>
+            • "Open Firefox and navigate to GitHub"<br>
+            • "Take a screenshot and save it"<br>
+            • "Show me my system resources"<br>
+            • "Switch to workspace 2 and open a terminal"
+        </div>
+    </div>
+
+    <script>
+        let ws = null;
+        const decoder = new TextDecoder();
+        const encoder = new TextEncoder();
+
+        function connect() {
+            ws = new WebSocket(`ws://${window.location.host}/ws`);
+            ws.binaryType = 'arraybuffer';
+
+            ws.onopen = () => {
+                console.log('Connected to server');
+                document.getElementById('status-text').textContent = 'Connected to daemon';
+            };
+
+            ws.onmessage = (event) => {
+                const text = typeof event.data === 'string' ? event.data : decoder.decode(event.data);
+                const data = JSON.parse(text);
+                handleMessage(data);
+            };
+
+            ws.onerror = (error) => {
+                console.error('WebSocket error:', error);
+                document.getElementById('status-text').textContent = 'Connection error';
+            };
+
+            ws.onclose = () => {
+                console.log('Disconnected from server');
+                document.getElementById('status-text').textContent = 'Disconnected';
+                setTimeout(connect, 3000);
+            };
+        }
+
+        function handleMessage(data) {
+            const messagesDiv = document.getElementById('messages');
+
+            if (data.type === 'batch') {
+                data.messages.forEach(handleMessage);
+            } else if (data.type === 'result') {
+                const result = data.result;
+                addMessage('assistant', result.explanation || 'Done!');
+
+                if (result.actions && result.actions.length > 0) {
+                    const actionsSummary = result.actions.map(a => 
+                        `${a.success ? '✓' : '✗'} ${JSON.stringify(a.action).substring(0, 50)}...`
+                    ).join('<br>');
+                    addMessage('assistant', actionsSummary, true);
                 }
-                
-                document.getElementById('query-input').addEventListener('keypress', (e) => {
-                    if (e.key === 'Enter') sendQuery();
-                });
-                
-                connect();
-            </script>
-        </body>
-        </html>
-        """
\ No newline at end of file
+            } else if (data.type === 'processing') {
+                addMessage('assistant', data.message);
+            }
+        }
+
+        function addMessage(role, content, isHtml = false) {
+            const messagesDiv = document.getElementById('messages');
+            const messageDiv = document.createElement('div');
+            messageDiv.className = `message ${role}`;
+
+            if (isHtml) {
+                messageDiv.innerHTML = content;
+            } else {
+                messageDiv.textContent = content;
+            }
+
+            messagesDiv.appendChild(messageDiv);
+            messagesDiv.scrollTop = messagesDiv.scrollHeight;
+        }
+
+        function sendQuery() {
+            const input = document.getElementById('query-input');
+            const query = input.value.trim();
+
+            if (!query || !ws || ws.readyState !== WebSocket.OPEN) return;
+
+            addMessage('user', query);
+
+            ws.send(encoder.encode(JSON.stringify({
+                type: 'query',
+                query: query,
+                screenshot: false
+            })));
+
+            input.value = '';
+        }
+
+        document.getElementById('query-input').addEventListener('keypress', (e) => {
+            if (e.key === 'Enter') sendQuery();
+        });
+
+        connect();
+    </script>
+</body>
+</html>
+""".encode('utf-8')